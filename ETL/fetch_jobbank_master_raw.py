@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import io
+import os
 import re
 import csv
+import gzip
+import json
+import shutil
+import codecs
 from io import BytesIO
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, Tuple, Dict, List
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple, Dict, List, Iterator
 
+import chardet
 import requests
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # =========================
@@ -22,24 +37,69 @@ CURRENT_YEAR = datetime.now().year
 
 # Output folders/files
 RAW_MONTHLY_DIR = Path("data/raw_monthly")         # save monthly raw (optional but recommended)
+# Downloaded bodies are also kept there byte-for-byte as {ym}.csv.gz (gzip level 1)
+# + {ym}.headers.json (ETag/Last-Modified), so re-runs revalidate with a conditional GET.
+# The monthly workflow keeps this folder in actions/cache (it isn't committed).
 RAW_MONTHLY_DIR.mkdir(parents=True, exist_ok=True)
 
 PROCESSED_DIR = Path("data/processed")
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
 MASTER_PARQUET = PROCESSED_DIR / "jobbank_master.parquet"
-MASTER_CSV = PROCESSED_DIR / "jobbank_master.csv"
+MASTER_CSV = PROCESSED_DIR / "jobbank_master.csv"   # only written if SAVE_MASTER_CSV
+
+# Small artifacts published next to the master so the dashboard's first render
+# doesn't need the big file: its first PREVIEW_ROWS rows, and row count + schema
+PREVIEW_PARQUET = PROCESSED_DIR / "jobbank_preview.parquet"
+SUMMARY_JSON = PROCESSED_DIR / "jobbank_summary.json"
+PREVIEW_ROWS = 100
+
+# Parquet is the master artifact; the CSV copy is slow to write and ~5-10x larger
+SAVE_MASTER_CSV = False
 
 STATE_DIR = Path("data/state")
 STATE_DIR.mkdir(parents=True, exist_ok=True)
-STATE_PATH = STATE_DIR / "downloaded_months.txt"
+STATE_PATH = STATE_DIR / "downloaded_months.txt"   # JSON: {ym: {"enc", "sep"}}
+SCHEMA_PATH = STATE_DIR / "schema.json"             # JSON: {raw column: Arrow type}
 
-# Choose whether to also save each month raw CSV
-SAVE_MONTHLY_RAW_CSV = True
+# Below this, chardet's guess is ignored and latin1 is used
+CHARDET_MIN_CONFIDENCE = 0.5
 
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": "jobbank-raw-etl/1.0"})
+# Written into the master's parquet metadata: rows were deduplicated per month at
+# ingest and row groups are split by month. A master without it (older runs) gets
+# one full dedup pass and month split when rewritten. "2": "1" didn't split by month.
+DEDUP_VERSION = "2"
+
+# Master row groups hold at most this many rows and never span two months: reading
+# the first rows or filtering by month decodes small groups, not whole months
+ROW_GROUP_ROWS = 64_000
+
+# Choose whether to also save each parsed month (as parquet)
+SAVE_MONTHLY_RAW = True
+
+# Re-fetch every listed month even if already in state (reuses known enc/sep)
+FORCE_REPROCESS = False
 
+# Monthly downloads are network-bound: fetch/parse this many months at once
+MAX_WORKERS = 8
+
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "jobbank-raw-etl/1.0", "Accept-Encoding": "gzip, deflate"})
+# One keep-alive pool per host (catalog + resource hosts), enough connections for MAX_WORKERS
+_ADAPTER = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+
+# Columns added by fetch_and_parse (everything else is raw CSV data)
+TRACKING_COLS = [
+    "year", "month", "year_month", "month_start",
+    "source_resource_name", "source_url", "encoding_used", "delimiter_used",
+]
 
 MONTHS = {
     "january": 1, "february": 2, "march": 3, "april": 4,
@@ -47,6 +107,9 @@ MONTHS = {
     "september": 9, "october": 10, "november": 11, "december": 12
 }
 
+_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+_MONTH_RE = re.compile(r"\b(" + "|".join(MONTHS) + r")\b")
+
 
 # =========================
 # HELPERS
@@ -59,38 +122,57 @@ def english_only(name_lower: str) -> bool:
 def extract_year_month(name: str) -> Optional[Tuple[int, int]]:
     """Extract (year, month) from resource name using month word + 4-digit year."""
     s = name.lower()
-
-    year_m = re.search(r"\b(20\d{2})\b", s)
-    if not year_m:
-        return None
-    year = int(year_m.group(1))
-
-    month_name = None
-    for m in MONTHS:
-        if re.search(rf"\b{m}\b", s):
-            month_name = m
-            break
-    if not month_name:
+    year_m = _YEAR_RE.search(s)
+    month_m = _MONTH_RE.search(s)
+    if not year_m or not month_m:
         return None
-
-    return year, MONTHS[month_name]
+    return int(year_m.group(1)), MONTHS[month_m.group(1)]
 
 
 def ym_key(year: int, month: int) -> str:
     return f"{year}-{month:02d}"
 
 
-def load_state() -> set[str]:
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write via a temp file + os.replace so a killed run never leaves a half-written file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_state_dict() -> Dict[str, Dict[str, str]]:
+    """Load {ym: {"enc", "sep"}}; the legacy one-ym-per-line file maps to empty entries."""
     if not STATE_PATH.exists():
-        return set()
-    return set(
-        x.strip() for x in STATE_PATH.read_text(encoding="utf-8").splitlines()
-        if x.strip()
-    )
+        return {}
+    text = STATE_PATH.read_text(encoding="utf-8")
+    if text.lstrip().startswith("{"):
+        return json.loads(text)
+    return {x.strip(): {} for x in text.splitlines() if x.strip()}
+
+
+def save_state_dict(state: Dict[str, Dict[str, str]]) -> None:
+    write_text_atomic(STATE_PATH, json.dumps(state, indent=2, sort_keys=True) + "\n")
+
+
+def load_column_types() -> Dict[str, pa.DataType]:
+    """Arrow types of the raw columns, as unified in the master by the last run ({} on first run)."""
+    if not SCHEMA_PATH.exists():
+        return {}
+    out = {}
+    for name, type_str in json.loads(SCHEMA_PATH.read_text(encoding="utf-8")).items():
+        try:
+            out[name] = pa.type_for_alias(type_str)
+        except ValueError:
+            continue
+    return out
 
 
-def save_state(state: set[str]) -> None:
-    STATE_PATH.write_text("\n".join(sorted(state)) + "\n", encoding="utf-8")
+def save_column_types(schema: pa.Schema) -> None:
+    types = {
+        f.name: str(f.type) for f in schema
+        if f.name not in TRACKING_COLS and not pa.types.is_null(f.type)
+    }
+    write_text_atomic(SCHEMA_PATH, json.dumps(types, indent=2) + "\n")
 
 
 def sniff_delimiter(sample_text: str) -> str:
@@ -101,51 +183,179 @@ def sniff_delimiter(sample_text: str) -> str:
         return ","
 
 
-def read_csv_robust_from_bytes(content: bytes) -> Tuple[pd.DataFrame, str, str]:
+def _detect_encoding(content: bytes) -> str:
+    """
+    Guess the encoding from the first 64 KB only: BOM, then strict UTF-8,
+    then chardet. Never looks at (or decodes) the whole body.
+    Low-confidence chardet guesses (it happily calls French latin1 Greek or
+    Hebrew on small samples) fall back to latin1, as the old probe order did.
+    """
+    if content[:3] == b"\xef\xbb\xbf":
+        return "utf-8-sig"
+    if content[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return "utf-16"
+    sample = content[:65536]
+    try:
+        # final=False: the sample may end in the middle of a multi-byte char
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    guess = chardet.detect(sample)
+    if guess["encoding"] and guess["confidence"] >= CHARDET_MIN_CONFIDENCE:
+        return guess["encoding"]
+    return "latin1"
+
+
+class _PeekedStream(io.RawIOBase):
+    """Replay already-read `head` bytes, then continue reading from `raw`."""
+
+    def __init__(self, head: bytes, raw) -> None:
+        self._head = memoryview(head)
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._raw.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+def _read_csv_arrow(
+    source,
+    enc: str,
+    sep: str,
+    column_types: Optional[Dict[str, pa.DataType]] = None,
+) -> pa.Table:
+    """
+    Parse with Arrow's multithreaded C++ reader, skipping malformed rows.
+    Known `column_types` skip per-column type inference.
+    """
+    if isinstance(source, bytes):
+        source = pa.BufferReader(source)
+    table = pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(encoding=enc, use_threads=True, block_size=8 << 20),
+        parse_options=pacsv.ParseOptions(
+            delimiter=sep,
+            newlines_in_values=True,
+            invalid_row_handler=lambda row: "skip",
+        ),
+        convert_options=pacsv.ConvertOptions(column_types=column_types or {}, strings_can_be_null=True),
+    )
+    # Arrow falls back to binary for columns that don't decode: wrong encoding
+    if any(pa.types.is_binary(t) for t in table.schema.types):
+        raise ValueError(f"Some columns could not be decoded as {enc}")
+    return table
+
+
+def read_csv_bytes(
+    content: bytes,
+    enc: str,
+    sep: str,
+    column_types: Optional[Dict[str, pa.DataType]] = None,
+) -> pa.Table:
+    """Read CSV bytes with the Arrow engine; use the python engine only if Arrow rejects the file."""
+    try:
+        return _read_csv_arrow(content, enc, sep, column_types)
+    except pa.ArrowInvalid:
+        if column_types:
+            # Schema drifted (value no longer fits the stored type): infer again
+            return read_csv_bytes(content, enc, sep)
+        df = pd.read_csv(
+            BytesIO(content),
+            encoding=enc,
+            sep=sep,
+            engine="python",
+            on_bad_lines="skip",
+        )
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def read_csv_robust_from_bytes(
+    content: bytes,
+    known_enc: Optional[str] = None,
+    known_sep: Optional[str] = None,
+    column_types: Optional[Dict[str, pa.DataType]] = None,
+) -> Tuple[pa.Table, str, str]:
     """
     Read CSV robustly without changing column names/meaning:
       - auto detect delimiter
-      - try encodings
+      - detect encoding from a sample (latin1 as the only fallback)
       - tolerant parsing to avoid ParserError
-    Returns df + encoding + delimiter.
+    If known_enc/known_sep (from state) are given, they are tried first and
+    sniffing/probing only runs when they no longer work.
+    Returns Arrow table + encoding + delimiter.
     """
-    sample = content[:20000].decode("latin1", errors="replace")
+    if known_enc and known_sep:
+        try:
+            return read_csv_bytes(content, known_enc, known_sep, column_types), known_enc, known_sep
+        except Exception:
+            pass
+
+    detected = _detect_encoding(content)
+    sample = content[:20000].decode(detected, errors="replace")
     sep = sniff_delimiter(sample)
 
-    encodings_to_try = ["utf-8", "utf-8-sig", "latin1", "utf-16"]
+    # latin1 decodes any byte: last resort if the sample wasn't representative
+    encodings_to_try = list(dict.fromkeys([detected, "latin1"]))
     last_err = None
 
     for enc in encodings_to_try:
         try:
-            bio = BytesIO(content)
-            df = pd.read_csv(
-                bio,
-                encoding=enc,
-                sep=sep,
-                engine="python",
-                on_bad_lines="skip",
-            )
+            table = read_csv_bytes(content, enc, sep, column_types)
 
             # If delimiter sniff failed and got 1 column, try TSV
-            if df.shape[1] == 1 and sep != "\t":
-                bio2 = BytesIO(content)
-                df2 = pd.read_csv(
-                    bio2,
-                    encoding=enc,
-                    sep="\t",
-                    engine="python",
-                    on_bad_lines="skip",
-                )
-                if df2.shape[1] > 1:
-                    return df2, enc, "\t"
-
-            return df, enc, sep
+            if table.num_columns == 1 and sep != "\t":
+                table2 = read_csv_bytes(content, enc, "\t")
+                if table2.num_columns > 1:
+                    return table2, enc, "\t"
+
+            return table, enc, sep
         except Exception as e:
             last_err = e
 
     raise RuntimeError(f"Could not parse CSV bytes. Last error: {last_err}")
 
 
+def read_csv_robust_from_stream(
+    raw,
+    peek_bytes: int = 65536,
+    known_enc: Optional[str] = None,
+    known_sep: Optional[str] = None,
+    column_types: Optional[Dict[str, pa.DataType]] = None,
+) -> Tuple[pa.Table, str, str]:
+    """
+    Single-pass variant of read_csv_robust_from_bytes for a binary stream.
+    Delimiter and encoding are decided from the first `peek_bytes`, which are then
+    replayed in front of the rest of the stream, so the body is never held in memory.
+    With known_enc/known_sep no peeking or sniffing is done at all.
+    Raises ValueError if the data doesn't parse; the stream is consumed by then.
+    """
+    if known_enc and known_sep:
+        return _read_csv_arrow(raw, known_enc, known_sep, column_types), known_enc, known_sep
+
+    head = raw.read(peek_bytes)
+    enc = _detect_encoding(head)
+    sample = head[:20000].decode(enc, errors="replace")
+    sep = sniff_delimiter(sample)
+
+    # Same TSV fallback as the bytes reader, decided on the header line
+    first_line = sample.splitlines()[0] if sample else ""
+    if sep != "\t" and sep not in first_line and "\t" in first_line:
+        sep = "\t"
+
+    stream = io.BufferedReader(_PeekedStream(head, raw), buffer_size=8 << 20)
+    return _read_csv_arrow(stream, enc, sep, column_types), enc, sep
+
+
 def list_monthly_resources_dedup() -> List[Dict]:
     """
     List monthly resources, deduplicated so each YYYY-MM is chosen once.
@@ -203,90 +413,327 @@ def list_monthly_resources_dedup() -> List[Dict]:
     return out
 
 
-def load_master() -> Optional[pd.DataFrame]:
+def load_master() -> Optional[pa.Table]:
+    """Read the whole master as Arrow (memory-mapped, columns decoded in parallel)."""
     if MASTER_PARQUET.exists():
-        return pd.read_parquet(MASTER_PARQUET)
+        return pq.read_table(MASTER_PARQUET, memory_map=True, use_threads=True)
     return None
 
 
-def save_master(df: pd.DataFrame) -> None:
-    df.to_parquet(MASTER_PARQUET, index=False)
-    df.to_csv(MASTER_CSV, index=False)
-
+def constant_dictionary(value: str, n: int) -> pa.DictionaryArray:
+    """A column repeating one string: n int32 indices + a single value instead of n strings."""
+    return pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([value]))
 
-# =========================
-# MAIN
-# =========================
-def main() -> None:
-    state = load_state()
-    resources = list_monthly_resources_dedup()
 
-    print(f"Found {len(resources)} monthly CSV resources (EN, deduped).")
-    new_months = [r for r in resources if r["ym"] not in state]
+def drop_duplicate_rows(table: pa.Table) -> pa.Table:
+    """Arrow equivalent of DataFrame.drop_duplicates() (keeps first occurrences, in order)."""
+    # group_by doesn't keep row order on multiple keys: take each group's first row index
+    indexed = table.append_column("__row", pa.array(np.arange(len(table), dtype=np.int64)))
+    first = indexed.group_by(table.column_names, use_threads=False).aggregate([("__row", "min")])
+    return table.take(np.sort(first.column("__row_min").to_numpy()))
 
-    if not new_months:
-        print("No new months found. Master is up to date.")
-        return
 
-    print("New months to fetch:", [r["ym"] for r in new_months])
+def _plain_schema(schema: pa.Schema) -> pa.Schema:
+    """Drop pandas metadata and decode dictionary types so month schemas can be unified."""
+    return pa.schema(
+        pa.field(f.name, f.type.value_type if pa.types.is_dictionary(f.type) else f.type)
+        for f in schema
+    )
 
-    master = load_master()
-    new_frames = []
 
-    for r in new_months:
-        ym = r["ym"]
-        year = r["year"]
-        month = r["month"]
+def _unify_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+    """
+    Permissive unify_schemas, except that a column whose types can't be merged
+    (e.g. date32 in one month, string in an older master) becomes large_string
+    instead of failing the run; _conform then casts every input to it.
+    """
+    schemas = [_plain_schema(x) for x in schemas]
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        pass
+    types: Dict[str, List[pa.DataType]] = {}
+    for x in schemas:
+        for f in x:
+            types.setdefault(f.name, []).append(f.type)
+    fields = []
+    for name, candidates in types.items():
+        try:
+            merged = pa.unify_schemas(
+                [pa.schema([pa.field(name, t)]) for t in candidates], promote_options="permissive"
+            )
+            fields.append(merged.field(name))
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            print(f"⚠️ Column {name!r} has conflicting types {sorted(set(map(str, candidates)))}; storing as string")
+            fields.append(pa.field(name, pa.large_string()))
+    return pa.schema(fields)
+
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Cast `table` to `schema`, filling columns it doesn't have with nulls."""
+    cols = [
+        table.column(f.name).cast(f.type) if f.name in table.column_names
+        else pa.nulls(len(table), f.type)
+        for f in schema
+    ]
+    return pa.Table.from_arrays(cols, schema=schema)
+
+
+def _split_by_month(table: pa.Table) -> Iterator[pa.Table]:
+    """One table per year_month (in order of first appearance, rows in source order)."""
+    codes = pc.dictionary_encode(table["year_month"]).combine_chunks().indices
+    codes = pc.fill_null(codes, -1).to_numpy()
+    order = np.argsort(codes, kind="stable")
+    for rows in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+        if len(rows):
+            yield table.take(rows)
+
+
+def _master_chunks(old: pq.ParquetFile) -> Iterator[pa.Table]:
+    """
+    Existing master rows, one row group at a time. A master not yet marked gets
+    one full dedup pass and is split by month, so its row groups don't span months.
+    """
+    metadata = old.schema_arrow.metadata or {}
+    if metadata.get(b"dedup_version") == DEDUP_VERSION.encode():
+        for i in range(old.num_row_groups):
+            yield old.read_row_group(i)
+    else:
+        yield from _split_by_month(drop_duplicate_rows(old.read()))
 
-        print(f"\n⬇️ Fetching {ym} | {r['name']}")
 
-        content = SESSION.get(r["url"], timeout=120).content
+def update_master(
+    new_tables: List[pa.Table],
+    replace_months: List[str],
+    also_csv: bool = False,
+) -> Tuple[int, pa.Schema]:
+    """
+    Rewrite the master parquet without loading it: existing row groups are copied
+    one at a time (dropping rows of `replace_months`), then each new month is
+    appended as its own row group(s) of at most ROW_GROUP_ROWS rows. Returns
+    (rows, schema) of the new master.
+    """
+    old = pq.ParquetFile(MASTER_PARQUET) if MASTER_PARQUET.exists() else None
+    schemas = [t.schema for t in new_tables] + ([old.schema_arrow] if old else [])
+    schema = _unify_schemas(schemas)
+    schema = schema.with_metadata({"dedup_version": DEDUP_VERSION})
+
+    tmp_path = MASTER_PARQUET.with_suffix(".parquet.tmp")
+    total_rows = 0
+    with pq.ParquetWriter(
+        tmp_path,
+        schema,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+        write_statistics=True,
+        data_page_size=1 << 20,
+    ) as writer:
+        if old is not None:
+            with old:
+                for t in _master_chunks(old):
+                    if replace_months:
+                        t = t.filter(pc.invert(pc.is_in(t["year_month"], pa.array(replace_months))))
+                    if len(t) == 0:
+                        continue
+                    writer.write_table(_conform(t, schema), row_group_size=ROW_GROUP_ROWS)
+                    total_rows += len(t)
+        for t in new_tables:
+            writer.write_table(_conform(t, schema), row_group_size=ROW_GROUP_ROWS)
+            total_rows += len(t)
+    os.replace(tmp_path, MASTER_PARQUET)
+
+    if also_csv:
+        # The only place the master is converted to pandas
+        load_master().to_pandas().to_csv(MASTER_CSV, index=False)
+
+    return total_rows, schema
+
+
+def write_preview_and_summary() -> None:
+    """Write PREVIEW_PARQUET and SUMMARY_JSON from the master (first batch + footer only)."""
+    pf = pq.ParquetFile(MASTER_PARQUET)
+    batch = next(pf.iter_batches(batch_size=PREVIEW_ROWS), None)
+    preview = pa.Table.from_batches([batch]) if batch is not None else pf.schema_arrow.empty_table()
+    tmp_path = PREVIEW_PARQUET.with_suffix(".parquet.tmp")
+    pq.write_table(preview, tmp_path, compression="zstd", compression_level=3)
+    os.replace(tmp_path, PREVIEW_PARQUET)
+
+    summary = {
+        "num_rows": pf.metadata.num_rows,
+        "schema": [{"name": f.name, "type": str(f.type)} for f in pf.schema_arrow],
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    write_text_atomic(SUMMARY_JSON, json.dumps(summary, indent=2) + "\n")
+
+
+def download_cached(url: str, body_path: Path, headers_path: Path) -> Dict[str, str]:
+    """
+    Make sure `body_path` (gzip) holds the current body of `url`. If a cached copy
+    exists, revalidate it with If-None-Match/If-Modified-Since and keep it on 304;
+    otherwise stream the response to disk, compressed at level 1. Returns the cached validators (ETag, Last-Modified,
+    Content-Length).
+    """
+    cached: Dict[str, str] = {}
+    if body_path.exists() and headers_path.exists():
+        cached = json.loads(headers_path.read_text(encoding="utf-8"))
+
+    conditional = {}
+    if cached.get("ETag"):
+        conditional["If-None-Match"] = cached["ETag"]
+    if cached.get("Last-Modified"):
+        conditional["If-Modified-Since"] = cached["Last-Modified"]
+
+    with SESSION.get(url, headers=conditional, stream=True, timeout=120) as resp:
+        if resp.status_code == 304 and cached:
+            return cached
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = body_path.with_name(body_path.name + ".part")
+        with gzip.open(tmp_path, "wb", compresslevel=1) as f:
+            shutil.copyfileobj(resp.raw, f, length=1 << 20)
+        os.replace(tmp_path, body_path)
+
+        meta = {k: resp.headers.get(k, "") for k in ("ETag", "Last-Modified", "Content-Length")}
+    write_text_atomic(headers_path, json.dumps(meta, indent=2) + "\n")
+    return meta
+
+
+def fetch_and_parse(
+    r: Dict,
+    known: Optional[Dict[str, str]] = None,
+    column_types: Optional[Dict[str, pa.DataType]] = None,
+) -> Tuple[pa.Table, Dict[str, str], List[str]]:
+    """
+    Download one monthly resource, parse it into an Arrow table and add the tracking columns.
+    `known` is the month's previous state entry (enc/sep hints, may be empty),
+    `column_types` the stored Arrow schema of the raw columns.
+    Returns the table, the new state entry and warnings to report. Runs on worker
+    threads, so it doesn't print: main() does, one whole line at a time.
+    """
+    known = known or {}
+    ym = r["ym"]
+    year = r["year"]
+    month = r["month"]
 
-        # Parse raw (no semantic mapping)
-        df, enc_used, sep_used = read_csv_robust_from_bytes(content)
+    warnings: List[str] = []
 
-        # Add only minimal columns for tracking/time (does not change meaning)
-        df["year"] = year
-        df["month"] = month
-        df["year_month"] = ym
-        df["month_start"] = pd.to_datetime(f"{ym}-01")
-        df["source_resource_name"] = r["name"]
-        df["source_url"] = r["url"]
-        df["encoding_used"] = enc_used
-        df["delimiter_used"] = sep_used
+    cache_dir = RAW_MONTHLY_DIR / str(year)
+    body_path = cache_dir / f"{ym}.csv.gz"
+    download_cached(r["url"], body_path, cache_dir / f"{ym}.headers.json")
 
-        # Save monthly raw CSV (optional)
-        if SAVE_MONTHLY_RAW_CSV:
-            out_dir = RAW_MONTHLY_DIR / str(year)
-            out_dir.mkdir(parents=True, exist_ok=True)
-            monthly_path = out_dir / f"{ym}.csv"
-            df.to_csv(monthly_path, index=False)
+    # Parse raw (no semantic mapping), streamed from the cached body
+    try:
+        with gzip.open(body_path, "rb") as f:
+            table, enc_used, sep_used = read_csv_robust_from_stream(
+                f,
+                known_enc=known.get("enc"),
+                known_sep=known.get("sep"),
+                column_types=column_types,
+            )
+    except ValueError as e:
+        # Single-pass parse failed: load the body and run the full probe
+        warnings.append(f"⚠️ Streaming parse failed for {ym} ({e}); retried buffered")
+        content = gzip.decompress(body_path.read_bytes())
+        table, enc_used, sep_used = read_csv_robust_from_bytes(content, column_types=column_types)
 
-        new_frames.append(df)
-        state.add(ym)
+    # NOTE: We don't enforce semantic dedup because raw dataset may not have stable job_id.
+    # Keep it simple: drop exact duplicate rows only, on the raw columns.
+    table = drop_duplicate_rows(table)
+
+    # Add only minimal columns for tracking/time (does not change meaning)
+    n = len(table)
+    tracking = {
+        "year": pa.array(np.full(n, year, dtype=np.int16)),
+        "month": pa.array(np.full(n, month, dtype=np.int8)),
+        "year_month": constant_dictionary(ym, n),
+        "month_start": pa.array(np.full(n, np.datetime64(f"{ym}-01", "s"))),
+        "source_resource_name": constant_dictionary(r["name"], n),
+        "source_url": constant_dictionary(r["url"], n),
+        "encoding_used": constant_dictionary(enc_used, n),
+        "delimiter_used": constant_dictionary(sep_used, n),
+    }
+    for name, col in tracking.items():
+        table = table.append_column(name, col)
+
+    # Save monthly parsed parquet (optional; the untouched body is already in {ym}.csv.gz)
+    if SAVE_MONTHLY_RAW:
+        pq.write_table(
+            table,
+            cache_dir / f"{ym}.parquet",
+            compression="zstd",
+            compression_level=3,
+        )
+
+    return table, {"enc": enc_used, "sep": sep_used}, warnings
 
-        print(f"✅ Parsed {ym} | rows={len(df):,} cols={df.shape[1]} (enc={enc_used}, sep={repr(sep_used)})")
 
-    # Update master
-    new_all = pd.concat(new_frames, ignore_index=True, sort=False)
+# =========================
+# MAIN
+# =========================
+def main() -> None:
+    state = load_state_dict()
+    resources = list_monthly_resources_dedup()
 
-    if master is None:
-        combined = new_all
+    print(f"Found {len(resources)} monthly CSV resources (EN, deduped).")
+    if FORCE_REPROCESS:
+        new_months = resources
     else:
-        combined = pd.concat([master, new_all], ignore_index=True, sort=False)
+        new_months = [r for r in resources if r["ym"] not in state]
 
-    # NOTE: We don't enforce semantic dedup because raw dataset may not have stable job_id.
-    # Keep it simple: drop exact duplicate rows only.
-    combined = combined.drop_duplicates()
+    if not new_months:
+        print("No new months found. Master is up to date.")
+        return
+
+    print("New months to fetch:", [r["ym"] for r in new_months])
 
-    save_master(combined)
-    save_state(state)
+    column_types = load_column_types()
+
+    # Download + parse months concurrently; results are re-ordered by month below
+    results: Dict[str, Tuple[pa.Table, Dict[str, str]]] = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        for r in new_months:
+            print(f"⬇️ Fetching {r['ym']} | {r['name']}")
+            futures[executor.submit(fetch_and_parse, r, state.get(r["ym"]), column_types)] = r["ym"]
+        # Progress is printed here, on the main thread, so lines never interleave
+        for fut in as_completed(futures):
+            ym = futures[fut]
+            table, meta, warnings = fut.result()
+            for w in warnings:
+                print(w)
+            print(
+                f"✅ Parsed {ym} | rows={len(table):,} cols={table.num_columns} "
+                f"(enc={meta['enc']}, sep={repr(meta['sep'])})"
+            )
+            results[ym] = (table, meta)
+
+    new_tables = [results[r["ym"]][0] for r in new_months]
+    for ym, (_, meta) in results.items():
+        state[ym] = meta
+
+    # Update master: new months are already Arrow tables, history is streamed through.
+    # Reprocessed months replace their old rows.
+    total_rows, master_schema = update_master(
+        new_tables,
+        replace_months=[r["ym"] for r in new_months],
+        also_csv=SAVE_MASTER_CSV,
+    )
+    write_preview_and_summary()
+    save_state_dict(state)
+    # Widest types seen across all months (e.g. Salary double if any month had a
+    # float), so next run's streaming parse doesn't trip on one month's narrow guess
+    save_column_types(master_schema)
 
     print("\n🎉 ETL done.")
     print(f"Master parquet: {MASTER_PARQUET}")
-    print(f"Master csv:     {MASTER_CSV}")
-    print(f"Total rows:     {len(combined):,}")
-    print(f"Total cols:     {combined.shape[1]}")
+    print(f"Preview/summary: {PREVIEW_PARQUET}, {SUMMARY_JSON}")
+    if SAVE_MASTER_CSV:
+        print(f"Master csv:     {MASTER_CSV}")
+    print(f"Total rows:     {total_rows:,}")
+    print(f"Total cols:     {len(master_schema)}")
 
 
 if __name__ == "__main__":
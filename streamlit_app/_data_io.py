@@ -0,0 +1,278 @@
+"""
+Download and file helpers for the dashboard: no Streamlit calls, so app.py owns
+all caching and UI. (Not named _io.py: that is a built-in module, and a local
+file of that name would never be imported.)
+
+A local copy at `dest` comes with sidecars next to it: the in-progress download
+(part_path), its range progress (ranges_path) and its HTTP validators (meta_path).
+"""
+import json
+import logging
+import os
+import re
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Large files are fetched as parallel HTTP Range requests of this size
+RANGE_CHUNK = 16 * 1024 * 1024
+DOWNLOAD_WORKERS = 8
+COPY_BUFSIZE = 4 * 1024 * 1024
+
+# Local layout (what the ETL publishes): zstd, dictionary pages, statistics, and
+# row groups of at most ROW_GROUP_ROWS rows. Other files are rewritten once on download.
+ROW_GROUP_ROWS = 64_000
+
+# progress(bytes_done, bytes_total); bytes_total is 0 when the server doesn't say
+Progress = Callable[[int, int], None]
+
+class DownloadError(RuntimeError):
+    """The server answered, but not with a usable parquet file (HTML page, truncated body)."""
+
+def make_session() -> requests.Session:
+    """Keep-alive session; callers cache one per server (Streamlit reruns rebuild module globals)."""
+    session = requests.Session()
+    # Pool covers DOWNLOAD_WORKERS range requests plus HEADs; retry only transient gateway errors
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def cache_dir() -> Path:
+    """Streamlit Cloud's persistent mount if writable, else the user cache dir (survives restarts)."""
+    mount = Path("/mount/data")
+    if mount.is_dir() and os.access(mount, os.W_OK):
+        return mount
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    path = base / "jobbank"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def meta_path(dest: Path) -> Path:
+    """ETag / Last-Modified of the local copy."""
+    return dest.with_suffix(".meta.json")
+
+def part_path(dest: Path) -> Path:
+    """Downloads go here and are renamed over `dest` only once complete and valid."""
+    return dest.with_name(dest.name + ".part")
+
+def ranges_path(dest: Path) -> Path:
+    """Progress of an unfinished ranged download."""
+    return dest.with_suffix(".ranges.json")
+
+def direct_download_url(url: str) -> str:
+    """
+    Google Drive share links (.../file/d/<id>/view, ...?id=<id>) serve an HTML page,
+    and for large files even the uc link answers with a virus-scan interstitial.
+    Rewrite them to the download endpoint with confirm=t, which skips both.
+    Any other URL is returned unchanged.
+    """
+    parts = urlsplit(url)
+    if parts.hostname not in ("drive.google.com", "docs.google.com"):
+        return url
+    m = re.search(r"/file/d/([\w-]+)", parts.path)
+    file_id = m.group(1) if m else parse_qs(parts.query).get("id", [""])[0]
+    if not file_id:
+        return url
+    query = urlencode({"id": file_id, "export": "download", "confirm": "t", "uuid": uuid.uuid4().hex})
+    return f"https://drive.usercontent.google.com/download?{query}"
+
+def check_content_type(headers) -> None:
+    """Refuse HTML/text answers (login, quota or virus-scan pages) before writing anything."""
+    ctype = headers.get("Content-Type", "")
+    if ctype and not ctype.startswith(("application/", "binary/")):
+        raise DownloadError(f"Expected a parquet file but the server sent {ctype!r}")
+
+def is_parquet(p: Path) -> bool:
+    """
+    Parquet starts *and* ends with b"PAR1"; checking both catches truncated downloads.
+    Reads 8 bytes, never the file.
+    """
+    try:
+        size = p.stat().st_size
+        if size < 12:   # header magic + footer length + footer magic
+            return False
+        fd = os.open(p, os.O_RDONLY)
+        try:
+            return os.pread(fd, 4, 0) == b"PAR1" and os.pread(fd, 4, size - 4) == b"PAR1"
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
+
+def _fetch_range(session: requests.Session, url: str, fd: int, start: int, end: int) -> None:
+    """GET bytes [start, end] and pwrite them at their offset (workers never share a file position)."""
+    headers = {"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}
+    with session.get(url, headers=headers, stream=True, timeout=300) as r:
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise RuntimeError(f"Server ignored Range request (HTTP {r.status_code})")
+        offset = start
+        r.raw.decode_content = True
+        while chunk := r.raw.read(COPY_BUFSIZE):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+    if offset != end + 1:
+        raise IOError(f"Short read for bytes {start}-{end}")
+
+def download_ranges(
+    session: requests.Session,
+    url: str,
+    dest: Path,
+    size: int,
+    etag: str,
+    progress: Progress | None = None,
+) -> None:
+    """
+    Fetch `size` bytes as RANGE_CHUNK pieces on DOWNLOAD_WORKERS threads into a
+    preallocated part_path(dest). Finished pieces are recorded in ranges_path(dest),
+    so an interrupted download of the same ETag resumes with the missing pieces only.
+    """
+    part, ranges = part_path(dest), ranges_path(dest)
+    done: set[int] = set()
+    if ranges.exists() and part.exists() and part.stat().st_size == size:
+        saved = json.loads(ranges.read_text(encoding="utf-8"))
+        if saved.get("etag") == etag and saved.get("size") == size:
+            done = set(saved["done"])
+
+    todo = [(a, min(a + RANGE_CHUNK, size) - 1) for a in range(0, size, RANGE_CHUNK) if a not in done]
+    if done:
+        logger.info("Resuming download: %d of %d pieces left", len(todo), len(todo) + len(done))
+
+    fd = os.open(part, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            futures = {executor.submit(_fetch_range, session, url, fd, a, b): a for a, b in todo}
+            for fut in as_completed(futures):
+                fut.result()
+                done.add(futures[fut])
+                ranges.write_text(
+                    json.dumps({"etag": etag, "size": size, "done": sorted(done)}), encoding="utf-8"
+                )
+                if progress:
+                    progress(sum(min(RANGE_CHUNK, size - a) for a in done), size)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    ranges.unlink(missing_ok=True)
+
+def needs_compaction(p: Path) -> bool:
+    """True if any row group is larger than ROW_GROUP_ROWS or any column chunk isn't zstd (footer only)."""
+    md = pq.ParquetFile(p).metadata
+    for g in range(md.num_row_groups):
+        rg = md.row_group(g)
+        if rg.num_rows > ROW_GROUP_ROWS:
+            return True
+        if any(rg.column(c).compression != "ZSTD" for c in range(rg.num_columns)):
+            return True
+    return False
+
+def compact(p: Path) -> None:
+    """
+    Rewrite `p` in the local layout, one source row group at a time. Large groups
+    are split, never merged, so month boundaries from the ETL are kept.
+    """
+    tmp = p.with_name(p.name + ".tmp")
+    pf = pq.ParquetFile(p, memory_map=True)
+    with pq.ParquetWriter(
+        tmp,
+        pf.schema_arrow,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,
+        write_statistics=True,
+        data_page_size=1 << 20,
+    ) as writer:
+        for g in range(pf.num_row_groups):
+            writer.write_table(pf.read_row_group(g), row_group_size=ROW_GROUP_ROWS)
+    pf.close()
+    os.replace(tmp, p)
+
+def conditional_headers(dest: Path) -> dict[str, str]:
+    """If-None-Match / If-Modified-Since for the local copy (empty if it has no validators)."""
+    if not meta_path(dest).exists():
+        return {}
+    meta = json.loads(meta_path(dest).read_text(encoding="utf-8"))
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+def download(session: requests.Session, url: str, dest: Path, progress: Progress | None = None) -> bool:
+    """
+    Download into part_path(dest), then atomically replace `dest` once the file is
+    fsynced and has parquet magic at both ends. Readers never see a partial file,
+    and the previous copy stays in place if anything fails.
+
+    If `dest` exists the GET is conditional on its validators; returns False
+    (nothing downloaded) when the server answers 304 Not Modified.
+    """
+    part = part_path(dest)
+    # Parquet is already compressed: don't let the server gzip it again
+    headers = {"Accept-Encoding": "identity"}
+    if dest.exists():
+        headers.update(conditional_headers(dest))
+    with session.get(url, headers=headers, stream=True, allow_redirects=True, timeout=300) as r:
+        logger.debug("HTTP status: %s", r.status_code)
+        if r.status_code == 304:
+            logger.info("Source unchanged (304), keeping %s", dest)
+            return False
+        r.raise_for_status()
+        check_content_type(r.headers)
+        logger.info("Downloading from %s", url)
+        validators = r.headers
+        size = int(r.headers.get("Content-Length") or 0)
+        ranged = r.headers.get("Accept-Ranges") == "bytes" and size > RANGE_CHUNK
+        if not ranged:
+            r.raw.decode_content = True
+            # Large reads keep the per-chunk Python overhead negligible; writes are
+            # already big, so no file buffering
+            with open(part, "wb", buffering=0) as f:
+                written = 0
+                while chunk := r.raw.read(COPY_BUFSIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+                    if progress:
+                        progress(written, size)
+                os.fsync(f.fileno())
+    if ranged:
+        # The body above is dropped unread; ranges go to the final (post-redirect)
+        # URL, e.g. the release asset CDN
+        download_ranges(session, r.url, dest, size, validators.get("ETag", ""), progress)
+
+    if not is_parquet(part):
+        part.unlink(missing_ok=True)
+        ranges_path(dest).unlink(missing_ok=True)
+        raise DownloadError("Downloaded file is not a valid Parquet (missing PAR1 header/footer)")
+    if needs_compaction(part):
+        logger.info("Rewriting download as zstd with row groups of <= %d rows", ROW_GROUP_ROWS)
+        compact(part)
+    os.replace(part, dest)
+    meta_path(dest).write_text(
+        json.dumps({"etag": validators.get("ETag", ""), "last_modified": validators.get("Last-Modified", "")}),
+        encoding="utf-8",
+    )
+    logger.info("Downloaded %d bytes to %s", dest.stat().st_size, dest)
+    return True
+
+def fetch_bytes(session: requests.Session, url: str) -> bytes:
+    """Whole body of a small artifact (preview/summary)."""
+    r = session.get(direct_download_url(url), allow_redirects=True, timeout=60)
+    r.raise_for_status()
+    return r.content
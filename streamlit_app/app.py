@@ -1,69 +1,281 @@
+import hashlib
+import itertools
+import json
+import logging
+import threading
+
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
 import requests
-from pathlib import Path
+
+from _data_io import (
+    DownloadError,
+    Progress,
+    cache_dir,
+    conditional_headers,
+    direct_download_url,
+    download,
+    fetch_bytes,
+    make_session,
+    meta_path,
+)
 
 st.set_page_config(page_title="Canada Job Bank Dashboard", layout="wide")
+# Paint the page before any secrets/network work so the first render isn't blank
+st.title("🇨🇦 Canada Job Bank – Job Postings Dashboard")
+
+# Progress/diagnostics go to the server log; the page only shows errors.
+# Open the app with ?debug=1 to also render the diagnostics panel.
+logger = logging.getLogger(__name__)
+DEBUG = st.query_params.get("debug") == "1"
 
-st.write("✅ App started")
-st.write("✅ Secrets keys:", list(st.secrets.keys()))
+def setup_logging() -> None:
+    """INFO and up from the app's loggers to stderr (the server log); reruns add no second handler."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    for name in (__name__, "_data_io"):
+        lg = logging.getLogger(name)
+        if not lg.handlers:
+            lg.addHandler(handler)
+            lg.setLevel(logging.INFO)
+            lg.propagate = False
+
+setup_logging()
 
 # --- MUST exist in Streamlit Secrets ---
 # DATA_URL="https://github.com/<user>/<repo>/releases/download/<tag>/jobbank_master.parquet"
+# (or the Google Drive share link of the file the monthly workflow uploads)
 try:
     DATA_URL = st.secrets["DATA_URL"]
-    st.write("✅ DATA_URL found")
 except Exception as e:
     st.error("❌ Missing/invalid secret DATA_URL")
     st.exception(e)
     st.stop()
 
-LOCAL_PATH = Path("jobbank_master.parquet")
-
-def is_parquet(p: Path) -> bool:
-    try:
-        return p.exists() and p.stat().st_size > 4 and p.read_bytes()[:4] == b"PAR1"
-    except Exception:
-        return False
-
-def download(url: str, dest: Path) -> None:
-    st.write("⬇️ Downloading from:", url)
-    r = requests.get(url, stream=True, allow_redirects=True, timeout=300)
-    st.write("HTTP status:", r.status_code)
-    r.raise_for_status()
-    with open(dest, "wb") as f:
-        for chunk in r.iter_content(chunk_size=1024 * 1024):
-            if chunk:
-                f.write(chunk)
-    st.write("✅ Downloaded bytes:", dest.stat().st_size)
-
-@st.cache_data(show_spinner=True)
-def load_data(force: bool = False) -> pd.DataFrame:
-    if force and LOCAL_PATH.exists():
-        LOCAL_PATH.unlink()
-
-    if (not LOCAL_PATH.exists()) or (not is_parquet(LOCAL_PATH)):
-        if LOCAL_PATH.exists():
-            LOCAL_PATH.unlink()
-        download(DATA_URL, LOCAL_PATH)
-
-    st.write("✅ Reading parquet...")
-    df = pd.read_parquet(LOCAL_PATH)
-    st.write("✅ Read done. Shape:", df.shape)
-    return df
+SOURCE_URL = direct_download_url(DATA_URL)
 
-st.title("🇨🇦 Canada Job Bank – Job Postings Dashboard")
+# One local copy per source URL
+LOCAL_PATH = cache_dir() / f"jobbank_{hashlib.sha256(DATA_URL.encode()).hexdigest()[:16]}.parquet"
+META_PATH = meta_path(LOCAL_PATH)
+
+# ETL bookkeeping columns, not shown in the UI (and never read from disk)
+ETL_ONLY_COLS = {"source_resource_name", "source_url", "encoding_used", "delimiter_used"}
+PREVIEW_ROWS = 100
+# The full view sends at most this many rows to the browser (the count shows the total)
+TABLE_ROWS = 10_000
+
+# Period choices for the full view: trailing months counted back from the latest
+# month in the file (None = everything). The ETL's row groups never span months and
+# carry month_start statistics, so a period filter skips whole row groups.
+PERIODS = {"Last 3 months": 3, "Last 12 months": 12, "All months": None}
+
+# Optional secret: DISPLAY_COLS=["Job Title", "Province", ...] to read only those columns
+DISPLAY_COLS = list(st.secrets.get("DISPLAY_COLS", []))
+
+# Optional secrets: URLs of the ETL's jobbank_preview.parquet / jobbank_summary.json.
+# With both set, the first render reads only these (a few KB) and the master is
+# downloaded when the full dataset is opened.
+PREVIEW_URL = st.secrets.get("PREVIEW_URL", "")
+SUMMARY_URL = st.secrets.get("SUMMARY_URL", "")
+SIDECARS = bool(PREVIEW_URL and SUMMARY_URL)
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive session for the whole server (module globals are rebuilt every rerun)."""
+    return make_session()
+
+SESSION = get_session()
+
+def to_frame(table: pa.Table) -> pd.DataFrame:
+    """Every frame the page shows: ArrowDtype columns wrap the Arrow buffers, types stay as stored."""
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def ui_columns(schema: pa.Schema) -> list[str]:
+    """Columns pushed down to the parquet reader; the others are never decoded."""
+    if DISPLAY_COLS:
+        return [c for c in DISPLAY_COLS if c in schema.names]
+    return [c for c in schema.names if c not in ETL_ONLY_COLS]
+
+@st.cache_resource(show_spinner=False)
+def _sync_state() -> dict:
+    """
+    Server-wide: whether LOCAL_PATH was revalidated since start (or the last
+    refresh), whether the next check must be forced (a refresh deferred until
+    the master is needed), plus a lock so concurrent sessions never download at
+    the same time.
+    """
+    return {"lock": threading.Lock(), "done": False, "force": False}
+
+def mark_local_copy_stale() -> None:
+    """Refresh without downloading now: the next ensure_local_copy does a forced check."""
+    state = _sync_state()
+    with state["lock"]:
+        state["done"] = False
+        state["force"] = True
+
+def ensure_local_copy(force: bool = False, progress: Progress | None = None) -> None:
+    """
+    Make sure LOCAL_PATH is present and current. Runs outside the caches so the
+    page can show download progress (elements can't be emitted from a cached
+    function onto a block created outside it).
+    """
+    state = _sync_state()
+    with state["lock"]:
+        force = force or state["force"]
+        if state["done"] and not force:
+            return
+        # LOCAL_PATH only ever holds a complete download (see _data_io.download). It persists
+        # across restarts, so revalidate it with a conditional GET: a cold start keeps it
+        # unless the source provably changed; a forced refresh re-downloads unless
+        # provably unchanged.
+        if not LOCAL_PATH.exists():
+            download(SESSION, SOURCE_URL, LOCAL_PATH, progress)
+        elif not force and not conditional_headers(LOCAL_PATH):
+            logger.info("Using cached copy %s (no validators to check)", LOCAL_PATH)
+        else:
+            try:
+                download(SESSION, SOURCE_URL, LOCAL_PATH, progress)
+            except (requests.RequestException, DownloadError):
+                if force:
+                    raise
+                logger.warning("Could not revalidate %s, using cached copy", LOCAL_PATH, exc_info=True)
+        state["done"] = True
+        state["force"] = False
+
+@st.cache_resource(show_spinner=False)
+def _meta() -> pq.ParquetFile:
+    """
+    Local parquet (see ensure_local_copy), opened for footer/row-group access:
+    row count and schema come from the footer, no column is decoded.
+    """
+    return pq.ParquetFile(LOCAL_PATH, memory_map=True)
+
+@st.cache_data(show_spinner=False)
+def _summary() -> dict:
+    """The ETL's summary: {"num_rows", "schema", "updated_at"}."""
+    return json.loads(fetch_bytes(SESSION, SUMMARY_URL))
+
+@st.cache_data(show_spinner=False)
+def _num_rows() -> int:
+    """Total rows, from the summary or the parquet footer."""
+    if SIDECARS:
+        return _summary()["num_rows"]
+    return _meta().metadata.num_rows
+
+@st.cache_resource(show_spinner=False)
+def _preview() -> pd.DataFrame:
+    """
+    First PREVIEW_ROWS rows, from the ETL's preview file if configured, else from
+    the master (only its first batch is decoded, not the whole first row group).
+    Tiny and fixed for a given download, so it is kept as a shared, read-only
+    object instead of being pickled on every rerun.
+    """
+    if SIDECARS:
+        pf = pq.ParquetFile(pa.BufferReader(fetch_bytes(SESSION, PREVIEW_URL)))
+    else:
+        pf = _meta()
+    columns = ui_columns(pf.schema_arrow)
+    # Dtypes come from the parquet schema (no inference, same for an empty file)
+    schema = pa.schema([pf.schema_arrow.field(c) for c in columns])
+    batches = list(itertools.islice(pf.iter_batches(batch_size=PREVIEW_ROWS, columns=columns), 1))
+    return to_frame(pa.Table.from_batches(batches, schema=schema))
+
+@st.cache_data(show_spinner=False)
+def _latest_month() -> np.datetime64 | None:
+    """Latest month_start, from row-group statistics (no column is decoded)."""
+    pf = _meta()
+    if "month_start" not in pf.schema_arrow.names:
+        return None
+    i = pf.schema_arrow.get_field_index("month_start")
+    maxes = [
+        stats.max
+        for g in range(pf.num_row_groups)
+        if (stats := pf.metadata.row_group(g).column(i).statistics) is not None and stats.has_min_max
+    ]
+    return np.datetime64(max(maxes), "M") if maxes else None
+
+@st.cache_resource(show_spinner=True, max_entries=1)
+def load_data(months: int | None = None) -> pd.DataFrame:
+    """
+    Dataset (UI columns), limited to the trailing `months` months when given.
+    Converted once and shared by every session and rerun (cache_resource hands
+    out the same object: no hashing or pickle round-trip). Only the last period
+    asked for stays decoded; switching periods converts again.
+    Callers must treat it as read-only and .copy() before mutating.
+    """
+    pf = _meta()
+    condition = None
+    latest = _latest_month() if months else None
+    if latest is not None:
+        cutoff = (latest - (months - 1)).astype("datetime64[s]").item()   # -> datetime
+        month_type = pf.schema_arrow.field("month_start").type
+        # Pushed down to the scan: row groups whose statistics fall before the cutoff are never read
+        condition = ds.field("month_start") >= pa.scalar(cutoff, type=month_type)
+    dataset = ds.dataset(LOCAL_PATH, format="parquet", filesystem=fs.LocalFileSystem(use_mmap=True))
+    # Row groups / columns are decoded in parallel on Arrow's thread pool
+    table = dataset.to_table(columns=ui_columns(pf.schema_arrow), filter=condition, use_threads=True)
+    return to_frame(table)
+
+def clear_data_caches() -> None:
+    """
+    Forget everything derived from the local copy. The HTTP session and
+    _sync_state (the download lock other sessions may be holding) are kept.
+    """
+    _meta.clear()
+    _preview.clear()
+    load_data.clear()
+    st.cache_data.clear()
+
+status_slot = st.empty()
+
+def show_progress(done: int, total: int) -> None:
+    """Download progress in a collapsed status box; only shown while a download runs."""
+    label = f"⬇️ Downloading dataset… {done / 1e6:,.0f} MB"
+    if total:
+        label += f" of {total / 1e6:,.0f} MB"
+    status_slot.status(label, expanded=False)
 
 try:
     if st.button("🔄 Refresh data"):
-        st.cache_data.clear()
-        df = load_data(force=True)
-    else:
-        df = load_data()
+        # Revalidate under the lock first, then drop what was derived from the old copy.
+        # With the ETL's preview/summary the master check waits for the full view.
+        if SIDECARS:
+            mark_local_copy_stale()
+        else:
+            ensure_local_copy(force=True, progress=show_progress)
+        clear_data_caches()
+    # With the ETL's preview/summary the master is only needed for the full view
+    if not SIDECARS:
+        ensure_local_copy(progress=show_progress)
+        status_slot.empty()
+
+    st.success(f"Loaded {_num_rows():,} rows")
+    st.dataframe(_preview(), use_container_width=True)
 
-    st.success(f"Loaded {len(df):,} rows")
-    st.dataframe(df.head(100), use_container_width=True)
+    if st.toggle("📂 Load full dataset"):
+        ensure_local_copy(progress=show_progress)
+        status_slot.empty()
+        period = st.selectbox("Period", list(PERIODS), index=1)
+        df = load_data(PERIODS[period])
+        caption = f"{len(df):,} rows"
+        if len(df) > TABLE_ROWS:
+            caption += f" (showing the first {TABLE_ROWS:,})"
+        st.caption(caption)
+        st.dataframe(df.head(TABLE_ROWS), use_container_width=True)
 
 except Exception as e:
+    logger.exception("App crashed")
     st.error("❌ App crashed with exception:")
     st.exception(e)
+
+if DEBUG:
+    with st.expander("🛠 Diagnostics", expanded=True):
+        st.write("Secrets keys:", list(st.secrets.keys()))
+        st.write("Local copy:", str(LOCAL_PATH), LOCAL_PATH.stat().st_size if LOCAL_PATH.exists() else "missing")
+        if META_PATH.exists():
+            st.json(json.loads(META_PATH.read_text(encoding="utf-8")))
@@ -1,27 +1,41 @@
 import streamlit as st
 import requests
 
+from _data_io import check_content_type, direct_download_url, make_session
+
 st.set_page_config(page_title="Healthcheck", layout="wide")
 st.title("✅ Jobbank App Healthcheck")
 
 DATA_URL = st.secrets.get("DATA_URL", None)
 
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Keep-alive session reused across reruns, same settings as the app's."""
+    return make_session()
+
+SESSION = get_session()
+
 st.write("Has DATA_URL secret:", DATA_URL is not None)
 if DATA_URL:
     st.code(DATA_URL)
+    # Probe what the app actually downloads (Drive share links are rewritten)
+    SOURCE_URL = direct_download_url(DATA_URL)
+    if SOURCE_URL != DATA_URL:
+        st.write("Download URL:")
+        st.code(SOURCE_URL)
 
     try:
         st.subheader("1) HEAD request")
-        h = requests.head(DATA_URL, allow_redirects=True, timeout=60)
+        h = SESSION.head(SOURCE_URL, allow_redirects=True, timeout=60)
         st.write("HEAD status:", h.status_code)
         st.write("Final URL:", h.url)
         st.write("Content-Type:", h.headers.get("Content-Type"))
         st.write("Content-Length:", h.headers.get("Content-Length"))
 
         st.subheader("2) GET first bytes (range)")
-        g = requests.get(
-            DATA_URL,
-            headers={"Range": "bytes=0-200"},
+        g = SESSION.get(
+            SOURCE_URL,
+            headers={"Range": "bytes=0-200", "Accept-Encoding": "identity"},
             allow_redirects=True,
             timeout=60,
         )
@@ -29,6 +43,8 @@ if DATA_URL:
         st.write("Final URL:", g.url)
         st.write("Content-Type:", g.headers.get("Content-Type"))
         st.write("First bytes:", g.content[:80])
+        check_content_type(g.headers)
+        st.success("Content-Type is fine for a parquet download")
 
     except Exception as e:
         st.error("Request failed:")